@@ -44,7 +44,7 @@ class JsonTree(Tree):
         if data is None:
             self.insert_node(AutoIdNode(accept_children=False), parent_id=pid)
             return
-        raise TypeError("Unsupported type %s" % type(data))
+        raise TypeError(f"Unsupported type {type(data)}")
 
     def to_json(self) -> Union[Dict, List, None]:
         if self.root is None:
@@ -1,27 +1,40 @@
 import re
 import unicodedata
 
+from functools import lru_cache
 from typing import Optional, Union, List, Any, Dict, TypeVar, Generic
 from lighttree.tree import Tree
 
+# compiled once at import, these run on every attribute check/coercion
+_VALID_ATTR_RE = re.compile(r"^[a-zA-Z_]+[a-zA-Z0-9_]*$")
+_NON_UNDERSCORE_RE = re.compile(r"[^_]")
+_INVALID_CHAR_RE = re.compile(r"[^a-zA-Z_0-9]")
+
 
 def is_valid_attr_name(item: Any) -> bool:
     if not isinstance(item, str):
         return False
+    return _is_valid_attr_str(item)
+
+
+@lru_cache(maxsize=4096)
+def _is_valid_attr_str(item: str) -> bool:
+    # memoized str-only validation: the same keys recur across nodes and expansions
     if item.startswith("__"):
         return False
-    if re.search(string=item, pattern=r"^[a-zA-Z_]+[a-zA-Z0-9_]*$") is None:
+    if _VALID_ATTR_RE.match(item) is None:
         return False
-    if re.search(string=item, pattern=r"[^_]") is None:
+    if _NON_UNDERSCORE_RE.search(item) is None:
         return False
     return True
 
 
-def _coerce_attr(attr: Any) -> Union[str, None]:
+@lru_cache(maxsize=4096)
+def _coerce_attr(attr: str) -> Union[str, None]:
     if not len(attr):
         return None
     new_attr = unicodedata.normalize("NFD", attr).encode("ASCII", "ignore").decode()
-    new_attr = re.sub(string=new_attr, pattern=r"[^a-zA-Z_0-9]", repl="_")
+    new_attr = _INVALID_CHAR_RE.sub("_", new_attr)
     if new_attr[0].isdigit():
         new_attr = "_" + new_attr
     if is_valid_attr_name(new_attr):
@@ -56,12 +69,11 @@ class Obj:
         # will store non-valid names
         self.__d: Dict[str, Any] = dict()
 
-        for k, v in kwargs.items():
+        for k in kwargs:
             if not is_valid_attr_name(k) or k == "_Obj__d":
-                raise ValueError(
-                    "Attribute <%s> of type <%s> is not valid." % (k, type(k))
-                )
-            self[k] = v
+                raise ValueError(f"Attribute <{k}> of type <{type(k)}> is not valid.")
+        # all keys were just validated as attribute names, bulk-assign without re-dispatching each
+        self.__dict__.update(kwargs)
 
     def __getitem__(self, item: Any) -> Any:
         # when calling d[key]
@@ -75,8 +87,8 @@ class Obj:
         if not isinstance(key, str):
             if self._STRING_KEY_CONSTRAINT:
                 raise ValueError(
-                    "Key <%s> of type <%s> cannot be set as attribute on <%s> instance."
-                    % (key, type(key), self.__class__.__name__)
+                    f"Key <{key}> of type <{type(key)}> cannot be set as attribute"
+                    f" on <{self.__class__.__name__}> instance."
                 )
             self.__d[key] = value
             return
@@ -102,10 +114,7 @@ class Obj:
         return item in self.__keys()
 
     def __str__(self) -> str:
-        return "<%s> %s" % (
-            str(self.__class__._REPR_NAME or self.__class__.__name__),
-            str(sorted(map(str, self.__keys()))),
-        )
+        return f"<{self.__class__._REPR_NAME or self.__class__.__name__}> {sorted(map(str, self.__keys()))}"
 
     def __repr__(self) -> str:
         return self.__str__()
@@ -155,6 +164,8 @@ class TreeBasedObj(Obj, Generic[GenericTree]):
             r = self._tree.root
             if r is None:
                 return
+            # batch children into one dict merge instead of one attribute dispatch per child
+            batch: Dict[str, Any] = {}
             for child_key, child_node in self._tree.children(nid=r):
                 if self._ATTR:
                     child_key = getattr(child_node, self._ATTR)
@@ -166,16 +177,22 @@ class TreeBasedObj(Obj, Generic[GenericTree]):
                     else:
                         str_child_key = child_key
                 else:
-                    str_child_key = "i%s" % child_key
+                    str_child_key = f"i{child_key}"
 
                 child_root: str
                 if self._root_path is not None:
-                    child_root = "%s.%s" % (self._root_path, child_key)
+                    child_root = f"{self._root_path}.{child_key}"
                 else:
                     child_root = str(child_key) if child_key else ""
-                self[str_child_key] = self._clone(
+                child_obj = self._clone(
                     child_node.identifier, root_path=child_root, depth=depth - 1
                 )
+                if is_valid_attr_name(str_child_key):
+                    batch[str_child_key] = child_obj
+                else:
+                    # rare keys needing coercion or item storage go through full dispatch
+                    self[str_child_key] = child_obj
+            self.__dict__.update(batch)
 
     def __getattribute__(self, item: Any) -> Any:
         # called by __getattribute__ will always refer to valid attribute item
@@ -195,17 +212,10 @@ class TreeBasedObj(Obj, Generic[GenericTree]):
 
     def _show(self, *args: Any, **kwargs: Any) -> str:
         tree_repr = self._tree.show(*args, **kwargs)
+        repr_name = self.__class__._REPR_NAME or self.__class__.__name__
         if self._root_path is None:
-            return "<%s>\n%s" % (
-                str(self.__class__._REPR_NAME or self.__class__.__name__),
-                str(tree_repr),
-            )
-        current_path = self._root_path
-        return "<%s subpart: %s>\n%s" % (
-            str(self.__class__._REPR_NAME or self.__class__.__name__),
-            str(current_path),
-            str(tree_repr),
-        )
+            return f"<{repr_name}>\n{tree_repr}"
+        return f"<{repr_name} subpart: {self._root_path}>\n{tree_repr}"
 
     def __call__(self, *args: Any, **kwargs: Any) -> GenericTree:
         return self._tree
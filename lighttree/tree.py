@@ -1,4 +1,7 @@
 import copy
+import sys
+
+from collections import deque
 
 from typing import (
     Tuple,
@@ -8,19 +11,16 @@ from typing import (
     Sequence,
     Callable,
     Iterable,
-    cast,
     Dict,
     Any,
     Generic,
     TypeVar,
     Iterator,
 )
-from collections import defaultdict
-from operator import itemgetter
 
 from lighttree.node import Node, NodeId
 from .exceptions import MultipleRootError, NotFoundNodeError, DuplicatedNodeError
-from .utils import STYLES
+from .utils import PREFIX_SEGMENTS
 
 # Generic self type, allowing more precise inherited typing
 # https://mypy.readthedocs.io/en/stable/generics.html#generic-methods-and-generic-self
@@ -36,8 +36,33 @@ GenericNode = TypeVar("GenericNode", bound=Node)
 KeyedNode = Tuple[Optional[Key], GenericNode]
 
 
-class Tree(Generic[GenericNode]):
+def _prefix_builder(line_type: str) -> Callable[[Tuple[bool, ...]], str]:
+    """Return a callable building line prefixes, with style glyphs and segments resolved only once.
+
+    Built prefixes are memoized per location tuple: siblings of a same parent share location tuples
+    (all but the last one), so rendering joins segments once per distinct tree location.
+    """
+    vert_seg, blank_seg, dt_line_box, dt_line_corner = PREFIX_SEGMENTS[line_type]
+    cache: Dict[Tuple[bool, ...], str] = {}
 
+    def build(is_last_list: Tuple[bool, ...]) -> str:
+        if not is_last_list:
+            return ""
+        prefix = cache.get(is_last_list)
+        if prefix is None:
+            # index iteration avoids copying the tuple minus its last element
+            leading = "".join(
+                blank_seg if is_last_list[i] else vert_seg
+                for i in range(len(is_last_list) - 1)
+            )
+            prefix = leading + (dt_line_corner if is_last_list[-1] else dt_line_box)
+            cache[is_last_list] = prefix
+        return prefix
+
+    return build
+
+
+class Tree(Generic[GenericNode]):
     """Principles:
     - each node is identified by an id
     - a tree cannot contain multiple nodes with same id
@@ -52,39 +77,78 @@ class Tree(Generic[GenericNode]):
 
     """
 
+    __slots__ = (
+        "root",
+        "_nodes_map",
+        "_nodes_parent",
+        "_nodes_children_map",
+        "_nodes_child_key",
+        "_nodes_children_list",
+        "_nodes_depth",
+        "_path_cache",
+        "_path_resolution_cache",
+        "_sorted_children_cache",
+    )
+
     def __init__(self: GenTree) -> None:
         # nodes references and hierarchy in tree
         self.root: Optional[NodeId] = None
         # node identifier -> node
         self._nodes_map: Dict[NodeId, GenericNode] = {}
-        # node identifier -> parent node identifier
-        self._nodes_parent: Dict[NodeId, Optional[NodeId]] = defaultdict(lambda: None)
-        # "map" node identifier -> map of children nodes identifier -> key
-        self._nodes_children_map: Dict[NodeId, Dict[NodeId, Key]] = defaultdict(dict)
-        # "list" node identifier -> children nodes identifiers
-        self._nodes_children_list: Dict[NodeId, List[NodeId]] = defaultdict(list)
+        # node identifier -> parent node identifier (None for root)
+        self._nodes_parent: Dict[NodeId, Optional[NodeId]] = {}
+        # "map" node identifier -> map of key -> children node identifier (kept in key order)
+        # keyed parents only ever hold str keys (int keys belong to "list" nodes)
+        self._nodes_children_map: Dict[NodeId, Dict[str, NodeId]] = {}
+        # child of "map" node identifier -> its key (reverse of above, one entry per keyed child)
+        self._nodes_child_key: Dict[NodeId, str] = {}
+        # "list" node identifier -> children nodes identifiers -> position
+        # (dict iteration order matches children order, which allows O(1) removal by identifier)
+        self._nodes_children_list: Dict[NodeId, Dict[NodeId, int]] = {}
+        # node identifier -> depth (0 for root), maintained incrementally on insertion/removal
+        self._nodes_depth: Dict[NodeId, int] = {}
+        # node identifier -> computed path (cached, wiped on any structural change)
+        self._path_cache: Dict[NodeId, Tuple[Key, ...]] = {}
+        # (path, strict) -> resolved node identifier (bounded cache, wiped on any structural change)
+        self._path_resolution_cache: Dict[Tuple[Tuple[Key, ...], bool], NodeId] = {}
+        # (node identifier, reverse) -> children sorted by key (cached, wiped on any structural change)
+        self._sorted_children_cache: Dict[Tuple[NodeId, bool], List[KeyedNode]] = {}
 
     def __contains__(self: GenTree, identifier: NodeId) -> bool:
         return identifier in self._nodes_map
 
+    def __len__(self) -> int:
+        """Return number of nodes in tree."""
+        return len(self._nodes_map)
+
     def get(self, nid: NodeId) -> KeyedNode:
         self._ensure_present(nid)
-        return self.get_key(nid), self._nodes_map[nid]
+        return self._kn(nid)
+
+    def _kn(self, nid: NodeId) -> KeyedNode:
+        """(key, node) pair of an id known to be present, without re-validation."""
+        node = self._nodes_map[nid]
+        pid = self._nodes_parent[nid]
+        if pid is None:
+            # root has no key
+            return None, node
+        if self._nodes_map[pid].keyed:
+            return self._nodes_child_key[nid], node
+        return self._nodes_children_list[pid][nid], node
 
     def child_id(self, nid: NodeId, key: Key) -> NodeId:
         _, node = self.get(nid)
         if node.keyed:
-            child_id = next(
-                (cid for cid, k in self._nodes_children_map[nid].items() if k == key),
-                None,
-            )
-            if child_id is None:
-                raise ValueError("No child of key %s below %s" % (key, nid))
-            return child_id
+            if isinstance(key, str):
+                try:
+                    return self._nodes_children_map[nid][key]
+                except KeyError:
+                    pass
+            raise ValueError(f"No child of key {key} below {nid}")
         try:
-            return self._nodes_children_list[nid][int(key)]
+            return list(self._nodes_children_list[nid])[int(key)]
         except (KeyError, ValueError, TypeError):
-            raise ValueError("No child of key %s below %s" % (key, nid))
+            raise ValueError(f"No child of key {key} below {nid}")
 
     def child(self, nid: NodeId, key: Key) -> KeyedNode:
         return self.get(self.child_id(nid, key))
@@ -95,7 +159,12 @@ class Tree(Generic[GenericNode]):
             raise ValueError("Empty tree")
         if path == "":
             return nid
-        for k in path:
+        path_tuple = tuple(path)
+        cache_key = (path_tuple, strict)
+        cached_nid = self._path_resolution_cache.get(cache_key)
+        if cached_nid is not None:
+            return cached_nid
+        for k in path_tuple:
             try:
                 nid = self.child_id(nid, k)
             except ValueError:
@@ -104,15 +173,37 @@ class Tree(Generic[GenericNode]):
                 nid = self.child_id(nid, int(k))
         if nid is None:
             raise ValueError("Not found")
+        if len(self._path_resolution_cache) >= 32:
+            # bounded cache: full wipe beats tracking recency per entry
+            self._path_resolution_cache.clear()
+        self._path_resolution_cache[cache_key] = nid
         return nid
 
     def get_path(self, nid: NodeId) -> Path:
-        return [
-            # ignore typing warning of potential None value, since None only applies at root node which is excluded
-            # [1:] -> exclude root node key
-            k  # type: ignore
-            for k, _ in self.ancestors(nid, from_root=True, include_current=True)[1:]
-        ]
+        """Return keys of nodes from root to node, root excluded.
+
+        Walks parent pointers and reads keys directly off children mappings, without materializing ancestor nodes.
+        Computed paths are cached until the next structural change of the tree.
+        """
+        self._ensure_present(nid)
+        cached_path = self._path_cache.get(nid)
+        if cached_path is not None:
+            return list(cached_path)
+        initial_nid = nid
+        keys: List[Key] = []
+        while nid != self.root:
+            pid = self._nodes_parent[nid]
+            if pid is None:
+                # cannot happen, only for typing
+                break
+            if self._nodes_map[pid].keyed:
+                keys.append(self._nodes_child_key[nid])
+            else:
+                keys.append(self._nodes_children_list[pid][nid])
+            nid = pid
+        keys.reverse()
+        self._path_cache[initial_nid] = tuple(keys)
+        return keys
 
     def get_key(self, nid: NodeId) -> Optional[Key]:
         """Get a node's key.
@@ -125,10 +216,13 @@ class Tree(Generic[GenericNode]):
         self._ensure_present(nid)
         if nid == self.root:
             return None
-        _, parent_node = self.parent(nid)
-        if parent_node.keyed:
-            return self._nodes_children_map[parent_node.identifier][nid]
-        return self._nodes_children_list[parent_node.identifier].index(nid)
+        pid = self._nodes_parent[nid]
+        if pid is None:
+            # cannot happen, only for typing
+            return None
+        if self._nodes_map[pid].keyed:
+            return self._nodes_child_key[nid]
+        return self._nodes_children_list[pid][nid]
 
     def list(
         self,
@@ -141,12 +235,16 @@ class Tree(Generic[GenericNode]):
         :param depth_in: list of int, optional, filter nodes whose depth in tree is among provided values
         :param filter\_: function, optional, filtering function to apply to each node
         """
+        # cheapest and most selective predicates first, key is only computed for kept nodes
+        id_set = None if id_in is None else frozenset(id_in)
+        depth_set = None if depth_in is None else frozenset(depth_in)
+        depths = self._nodes_depth
         return [
             (self.get_key(nid), node)
             for nid, node in self._nodes_map.items()
-            if (id_in is None or nid in id_in)
+            if (id_set is None or nid in id_set)
+            and (depth_set is None or depths[nid] in depth_set)
             and (filter_ is None or filter_(node))
-            and (depth_in is None or self.depth(nid) in depth_in)
         ]
 
     def is_empty(self) -> bool:
@@ -155,23 +253,29 @@ class Tree(Generic[GenericNode]):
         """
         return self.root is None
 
+    def _invalidate_caches(self) -> None:
+        self._path_cache.clear()
+        self._path_resolution_cache.clear()
+        self._sorted_children_cache.clear()
+
     def _ensure_present(
         self,
         nid: NodeId,
     ) -> None:
-        if nid is None or nid not in self:
-            raise NotFoundNodeError("Node id <%s> doesn't exist in tree" % nid)
+        if nid is None or nid not in self._nodes_map:
+            raise NotFoundNodeError(f"Node id <{nid}> doesn't exist in tree")
 
     def _validate_node_insertion(self, node: GenericNode) -> None:
         if node.identifier in self._nodes_map.keys():
-            raise DuplicatedNodeError(
-                "Can't create node with id '%s'" % node.identifier
-            )
+            raise DuplicatedNodeError(f"Can't create node with id '{node.identifier}'")
 
     def _validate_tree_insertion(self, tree: GenTree) -> None:
-        for node_key, node in tree.list():
-            # todo validate key
-            self._validate_node_insertion(node)
+        # todo validate keys
+        # isdisjoint short-circuits without allocating a set on the (common) no-overlap case
+        if self._nodes_map.keys().isdisjoint(tree._nodes_map.keys()):
+            return
+        common = self._nodes_map.keys() & tree._nodes_map.keys()
+        raise DuplicatedNodeError(f"Can't create node with id '{common.pop()}'")
 
     def _clone_init(self: GenTree, deep: bool, with_nodes: bool) -> GenTree:
         """Method intended to be overloaded, to avoid rewriting whole methods relying on `clone` method when
@@ -212,27 +316,44 @@ class Tree(Generic[GenericNode]):
         # remove eventual created nodes at init
         if new_tree.root:
             new_tree.drop_node(new_tree.root)
-        for i, (key, node) in enumerate(self.expand_tree(nid=new_root)):
-            nid = node.identifier
+        if new_root is None and not deep:
+            # identical topology and shared nodes: bulk-copy containers instead of re-inserting each node
+            return new_tree._bulk_copy_from(self)
+        source_root = new_root if new_root is not None else self.root
+        if source_root is None:
+            return new_tree
+        self._ensure_present(source_root)
+        # parent ids come with the traversal (the new root has no parent nor key)
+        for pid, key, node in self._expand_tree_with_parent(source_root):
             if deep:
                 node = copy.deepcopy(node)
-            if i == 0:
-                # necessary in case of new_root (the new root has no parent nor key)
-                pid = None
-                key = None
-            else:
-                pid = self.parent_id(nid)
-            new_tree.insert_node(node, parent_id=pid, key=key)
+            # source tree ids are unique by construction, skip per-node validation
+            new_tree._insert_node_below(node, parent_id=pid, key=key)
         return new_tree
 
+    def _bulk_copy_from(self: GenTree, source: GenTree) -> GenTree:
+        """Duplicate "source" topology wholesale, one container copy each instead of N insertions."""
+        self.root = source.root
+        self._nodes_map = dict(source._nodes_map)
+        self._nodes_parent = dict(source._nodes_parent)
+        self._nodes_children_map = {
+            nid: dict(children) for nid, children in source._nodes_children_map.items()
+        }
+        self._nodes_child_key = dict(source._nodes_child_key)
+        self._nodes_children_list = {
+            nid: dict(children) for nid, children in source._nodes_children_list.items()
+        }
+        self._nodes_depth = dict(source._nodes_depth)
+        return self
+
     def parent(self, nid: NodeId) -> KeyedNode:
         """Return parent node.
         Return None if given node id is root.
         """
         pid = self.parent_id(nid)
         if pid is None:
-            raise NotFoundNodeError("Node <%s> has no parent" % nid)
-        return self.get(pid)
+            raise NotFoundNodeError(f"Node <{nid}> has no parent")
+        return self._kn(pid)
 
     def parent_id(self, nid: NodeId) -> NodeId:
         if nid == self.root:
@@ -246,16 +367,33 @@ class Tree(Generic[GenericNode]):
 
     def children(self, nid: NodeId) -> List[KeyedNode]:
         """Return set of given node children node ids."""
-        return [self.get(id_) for id_ in self.children_ids(nid)]
+        self._ensure_present(nid)
+        return self._children_items(nid)
+
+    def _children_items(self, nid: NodeId) -> List[KeyedNode]:
+        """Children (key, node) pairs in key order, read directly off children containers.
+
+        Skips per-child validation and key resolution, for hot paths on an already validated node.
+        """
+        nodes = self._nodes_map
+        if nodes[nid].keyed:
+            return [
+                (key, nodes[cid]) for key, cid in self._nodes_children_map[nid].items()
+            ]
+        return [
+            (position, nodes[cid])
+            for cid, position in self._nodes_children_list[nid].items()
+        ]
 
     def children_ids(self, nid: NodeId) -> List[NodeId]:
         if self.get(nid)[1].keyed:
-            return list(self._nodes_children_map[nid].keys())
+            return list(self._nodes_children_map[nid].values())
         return list(self._nodes_children_list[nid])
 
     def siblings(self, nid: NodeId) -> List[KeyedNode]:
         """Return set of ids of nodes that share the provided node's parent."""
-        return [self.get(id_) for id_ in self.siblings_ids(nid)]
+        # ids come from this tree, skip per-id validation
+        return [self._kn(id_) for id_ in self.siblings_ids(nid)]
 
     def siblings_ids(self, nid: NodeId) -> List[NodeId]:
         self._ensure_present(nid)
@@ -264,15 +402,24 @@ class Tree(Generic[GenericNode]):
         parent_id = self.parent_id(nid)
         if parent_id is None:
             return []
-        return list(set(self.children_ids(parent_id)).difference({nid}))
+        # children ids are already unique, skip the set round-trip and keep children order
+        return [cid for cid in self.children_ids(parent_id) if cid != nid]
 
     def is_leaf(self, nid: NodeId) -> bool:
         """Return is node is a leaf in this tree."""
-        return len(self.children_ids(nid)) == 0
+        self._ensure_present(nid)
+        return self._is_leaf(nid)
+
+    def _is_leaf(self, nid: NodeId) -> bool:
+        # same as `is_leaf`, without validation nor children materialization
+        if self._nodes_map[nid].keyed:
+            return not self._nodes_children_map[nid]
+        return not self._nodes_children_list[nid]
 
     def depth(self, nid: NodeId) -> int:
         """Return node depth, 0 means root."""
-        return len(self.ancestors_ids(nid))
+        self._ensure_present(nid)
+        return self._nodes_depth[nid]
 
     def ancestors(
         self,
@@ -287,7 +434,7 @@ class Tree(Generic[GenericNode]):
         :return:
         """
         return [
-            self.get(id_) for id_ in self.ancestors_ids(nid, from_root, include_current)
+            self._kn(id_) for id_ in self.ancestors_ids(nid, from_root, include_current)
         ]
 
     def ancestors_ids(
@@ -298,13 +445,18 @@ class Tree(Generic[GenericNode]):
     ) -> List[NodeId]:
         self._ensure_present(nid)
         ancestor_ids = [nid] if include_current else []
-        if nid == self.root:
-            return ancestor_ids
-        while nid != self.root:
-            nid = self.parent_id(nid)
-            ancestor_ids.append(nid)
+        # chase parent pointers directly, without re-validating each hop
+        parents = self._nodes_parent
+        root = self.root
+        while nid != root:
+            pid = parents[nid]
+            if pid is None:
+                # cannot happen, only for typing
+                break
+            ancestor_ids.append(pid)
+            nid = pid
         if from_root:
-            ancestor_ids = list(reversed(ancestor_ids))
+            ancestor_ids.reverse()
         return ancestor_ids
 
     def subtree(self, nid: NodeId, deep: bool = False) -> KeyedTree:
@@ -315,11 +467,34 @@ class Tree(Generic[GenericNode]):
 
     def leaves(self, nid: Optional[NodeId] = None) -> List[KeyedNode]:
         """Return leaves under a node subtree."""
-        return [self.get(id_) for id_ in self.leaves_ids(nid)]
+        # ids come from this tree, skip per-id validation
+        return [self._kn(id_) for id_ in self.leaves_ids(nid)]
 
     def leaves_ids(self, nid: Optional[NodeId] = None) -> List[NodeId]:
-        tree = self if nid is None else self.subtree(nid)[1]
-        return [id_ for id_ in tree._nodes_map.keys() if tree.is_leaf(id_)]
+        if nid is None:
+            if self.root is None:
+                return []
+            nid = self.root
+        else:
+            self._ensure_present(nid)
+        return [id_ for id_ in self._iter_descendants_ids(nid) if self._is_leaf(id_)]
+
+    def _iter_descendants_ids(
+        self, nid: NodeId, include_current: bool = True
+    ) -> Iterator[NodeId]:
+        """Iterate on ids of a node and all of its descendants, depth-first, children in order.
+
+        Does not materialize nodes nor clone any subtree, only reads children containers.
+        """
+        stack = [nid]
+        while stack:
+            cid = stack.pop()
+            if include_current or cid != nid:
+                yield cid
+            if self._nodes_map[cid].keyed:
+                stack.extend(reversed(self._nodes_children_map[cid].values()))
+            else:
+                stack.extend(reversed(self._nodes_children_list[cid]))
 
     def insert(
         self: GenTree,
@@ -367,12 +542,34 @@ class Tree(Generic[GenericNode]):
         self._insert_node_below(node, parent_id=parent_id, key=key)
         return self.get_key(node.identifier)
 
+    def insert_nodes(
+        self,
+        nodes: Iterable[Tuple[GenericNode, Optional[NodeId], Optional[Key]]],
+    ) -> None:
+        """Insert multiple `(node, parent_id, key)` below-insertions at once.
+
+        Identifiers are validated in a single pass (against the tree and within the batch) before
+        any insertion. Parents must already be in tree, or appear earlier in the batch.
+        """
+        batch = list(nodes)
+        seen = set(self._nodes_map)
+        for node, _, _ in batch:
+            nid = node.identifier
+            if nid in seen:
+                raise DuplicatedNodeError(f"Can't create node with id '{nid}'")
+            seen.add(nid)
+        for node, parent_id, key in batch:
+            self._insert_node_below(node, parent_id=parent_id, key=key)
+
     def _insert_node_below(
         self,
         node: GenericNode,
         parent_id: Optional[NodeId],
         key: Optional[Key],
     ) -> None:
+        self._invalidate_caches()
+        # interned identifiers hash/compare faster in the many dict lookups they go through
+        node.identifier = sys.intern(node.identifier)
         # insertion at root
         if parent_id is None:
             if not self.is_empty():
@@ -381,6 +578,10 @@ class Tree(Generic[GenericNode]):
                 raise ValueError("No key on root node")
             self.root = node.identifier
             self._nodes_map[node.identifier] = node
+            self._nodes_parent[node.identifier] = None
+            self._nodes_depth[node.identifier] = 0
+            self._nodes_children_map[node.identifier] = {}
+            self._nodes_children_list[node.identifier] = {}
             return
 
         self._ensure_present(parent_id)
@@ -388,33 +589,52 @@ class Tree(Generic[GenericNode]):
 
         _, parent = self.get(parent_id)
         if not parent.accept_children:
-            raise ValueError("Parent node %s does not accept children." % parent_id)
+            raise ValueError(f"Parent node {parent_id} does not accept children.")
 
         # map
         if parent.keyed:
             if key is None:
                 raise ValueError("Key is compulsory")
             if not isinstance(key, str):
-                raise ValueError('Key must be of type "str", got %s' % type(key))
+                raise ValueError(f'Key must be of type "str", got {type(key)}')
+            key = sys.intern(key)
             if key in self._nodes_children_map[parent_id]:
                 # TODO add overwrite parameter
                 raise KeyError(
-                    "Already present node for key %s under %s node." % (key, parent_id)
+                    f"Already present node for key {key} under {parent_id} node."
                 )
             self._nodes_map[node_id] = node
             self._nodes_parent[node_id] = parent_id
-            self._nodes_children_map[parent_id][node_id] = key
+            self._nodes_depth[node_id] = self._nodes_depth[parent_id] + 1
+            self._nodes_child_key[node_id] = key
+            self._nodes_children_map[node_id] = {}
+            self._nodes_children_list[node_id] = {}
+            siblings = self._nodes_children_map[parent_id]
+            # keep children ordered by key, so that traversals don't need to re-sort them
+            if siblings and key < next(reversed(siblings)):
+                siblings[key] = node_id
+                self._nodes_children_map[parent_id] = dict(sorted(siblings.items()))
+            else:
+                siblings[key] = node_id
             return
 
         # list
         if key is None:
-            self._nodes_children_list[parent_id].append(node_id)
+            children = self._nodes_children_list[parent_id]
+            children[node_id] = len(children)
         else:
             if not isinstance(key, int):
-                raise ValueError("Key must be of type int, got %s" % type(key))
-            self._nodes_children_list[parent_id].insert(key, node_id)
+                raise ValueError(f"Key must be of type int, got {type(key)}")
+            order = list(self._nodes_children_list[parent_id])
+            order.insert(key, node_id)
+            self._nodes_children_list[parent_id] = {
+                cid: pos for pos, cid in enumerate(order)
+            }
         self._nodes_map[node_id] = node
         self._nodes_parent[node_id] = parent_id
+        self._nodes_depth[node_id] = self._nodes_depth[parent_id] + 1
+        self._nodes_children_map[node_id] = {}
+        self._nodes_children_list[node_id] = {}
 
     def _insert_node_above(
         self, node: GenericNode, child_id: NodeId, key: Optional[Key]
@@ -475,17 +695,21 @@ class Tree(Generic[GenericNode]):
                 raise MultipleRootError("A tree takes one root merely.")
         else:
             self._ensure_present(parent_id)
-        self._validate_tree_insertion(new_tree)
+        # duplicate-id validation is up to public callers (insert_tree); internal callers
+        # re-attach subtrees just detached from this tree, which cannot collide
 
         if new_tree.is_empty():
             return self
 
-        for i, (new_key, new_node) in enumerate(new_tree.expand_tree()):
-            if i == 0:
+        if new_tree.root is None:
+            # not possible, only for typing
+            raise ValueError("Empty inserted tree")
+        for pid, new_key, new_node in new_tree._expand_tree_with_parent(new_tree.root):
+            if pid is None:
+                pid = parent_id
                 new_key = key
-            nid = new_node.identifier
-            pid = parent_id if nid == new_tree.root else new_tree.parent_id(nid)
-            self.insert_node(new_node, parent_id=pid, key=new_key)
+            # duplicate ids were already validated tree-wise, skip per-node validation
+            self._insert_node_below(new_node, parent_id=pid, key=new_key)
         return self
 
     def _insert_tree_above(
@@ -517,22 +741,29 @@ class Tree(Generic[GenericNode]):
         """Return key, node"""
         if self.children_ids(nid):
             raise ValueError("Cannot drop node having children.")
+        self._invalidate_caches()
         key, node = self.get(nid)
         if nid != self.root:
             # dereference parent from child
             _, parent_node = self.parent(nid)
             pid = parent_node.identifier
-            self._nodes_parent.pop(nid)
             # dereference child from parent
             if parent_node.keyed:
-                self._nodes_children_map[pid].pop(nid)
+                self._nodes_children_map[pid].pop(self._nodes_child_key[nid])
             else:
-                self._nodes_children_list[pid].remove(nid)
+                children = self._nodes_children_list[pid]
+                position = children.pop(nid)
+                if position < len(children):
+                    # renumber displaced siblings
+                    for cid, pos in children.items():
+                        if pos > position:
+                            children[cid] = pos - 1
         # remove all references to node children (checked that empty before-hand)
-        if node.keyed:
-            self._nodes_children_map.pop(nid)
-        else:
-            self._nodes_children_list.pop(nid)
+        self._nodes_parent.pop(nid)
+        self._nodes_depth.pop(nid)
+        self._nodes_child_key.pop(nid, None)
+        self._nodes_children_map.pop(nid)
+        self._nodes_children_list.pop(nid)
         self._nodes_map.pop(nid)
         # dereference root if needed
         if nid == self.root:
@@ -551,24 +782,37 @@ class Tree(Generic[GenericNode]):
         """
         self._ensure_present(nid)
 
-        children_ids = self.children_ids(nid)
         if with_children:
-            for cid in children_ids:
-                self.drop_node(nid=cid, with_children=True)
+            # iterative removal, deepest nodes first so that each drop hits a leaf
+            descendant_ids = list(
+                self._iter_descendants_ids(nid, include_current=False)
+            )
+            for cid in reversed(descendant_ids):
+                self._drop_node(nid=cid)
             return self._drop_node(nid=nid)
 
+        children_ids = self.children_ids(nid)
         # drop a single node, and re-attach children to parent
         removed_key, removed_subtree = self.subtree(nid)
         if nid == self.root and len(children_ids) > 1:
             raise MultipleRootError(
-                "Cannot drop current root <%s> without its children, else tree would have "
-                "multiple roots" % nid
+                f"Cannot drop current root <{nid}> without its children, else tree would have "
+                "multiple roots"
             )
         _, parent = self.parent(nid)
         _, node = self.get(nid)
         if parent.keyed != node.keyed:
             raise ValueError("Invalid operation.")
         pid = parent.identifier
+        if node.keyed:
+            # validate before mutating so that a key collision leaves the tree untouched
+            sibling_keys = set(self._nodes_children_map[pid])
+            sibling_keys.discard(self._nodes_child_key[nid])
+            for child_key in self._nodes_children_map[nid]:
+                if child_key in sibling_keys:
+                    raise KeyError(
+                        f"Already present node for key {child_key} under {pid} node."
+                    )
         self.drop_node(nid, with_children=True)
         for cid in children_ids:
             k, st = removed_subtree.subtree(cid)
@@ -603,43 +847,64 @@ class Tree(Generic[GenericNode]):
         if self.is_empty():
             return None
         if mode not in ("depth", "width"):
-            raise NotImplementedError("Traversal mode '%s' is not supported" % mode)
+            raise NotImplementedError(f"Traversal mode '{mode}' is not supported")
         if nid is None:
             nid = self.root
         else:
             self._ensure_present(nid)
         if nid is not None:
-            key, node = self.get(nid)
-            filter_pass_node = filter_ is None or filter_(key, node)
-            if filter_pass_node:
-                yield key, node
-            if filter_pass_node or filter_through:
-                queue = [
-                    (child_key, child_node)
-                    for child_key, child_node in self.children(nid)
-                    if filter_ is None
-                    or filter_through
-                    or filter_(child_key, child_node)
-                ]
-                queue.sort(key=itemgetter(0), reverse=reverse)
+            # explicit stack/queue traversal: O(1) per push/pop, no per-level list concatenations
+            if mode == "depth":
+                stack: List[KeyedNode] = [self.get(nid)]
+                while stack:
+                    current_key, current_node = stack.pop()
+                    filter_pass_node = filter_ is None or filter_(
+                        current_key, current_node
+                    )
+                    if filter_pass_node:
+                        yield current_key, current_node
+                    if filter_pass_node or filter_through:
+                        children = self._children_items(current_node.identifier)
+                        # children are in key order, push reversed so they pop in order
+                        if not reverse:
+                            children.reverse()
+                        stack.extend(children)
+            else:
+                queue = deque((self.get(nid),))
                 while queue:
-                    current_key, current_node = queue.pop(0)
-                    if filter_ is None or filter_(current_key, current_node):
+                    current_key, current_node = queue.popleft()
+                    filter_pass_node = filter_ is None or filter_(
+                        current_key, current_node
+                    )
+                    if filter_pass_node:
                         yield current_key, current_node
-                    expansion = [
-                        (gchild_key, gchild_node)
-                        for gchild_key, gchild_node in self.children(
-                            current_node.identifier
-                        )
-                        if filter_ is None
-                        or filter_through
-                        or filter_(gchild_key, gchild_node)
-                    ]
-                    expansion.sort(key=itemgetter(0), reverse=reverse)
-                    if mode == "depth":
-                        queue = expansion + queue  # depth-first
-                    elif mode == "width":
-                        queue = queue + expansion  # width-first
+                    if filter_pass_node or filter_through:
+                        children = self._children_items(current_node.identifier)
+                        if reverse:
+                            children.reverse()
+                        queue.extend(children)
+
+    def _expand_tree_with_parent(
+        self, nid: NodeId
+    ) -> Iterator[Tuple[Optional[NodeId], Optional[Key], GenericNode]]:
+        """Pre-order traversal yielding (parent id, key, node) triplets.
+
+        Parent ids come from the traversal stack itself, sparing a parent_id lookup per node.
+        The traversal start is yielded with a None parent and key.
+        """
+        stack: List[Tuple[Optional[NodeId], Optional[Key], GenericNode]] = [
+            (None, None, self._nodes_map[nid])
+        ]
+        while stack:
+            pid, key, node = stack.pop()
+            yield pid, key, node
+            current_id = node.identifier
+            children = self._children_items(current_id)
+            children.reverse()
+            stack.extend(
+                (current_id, child_key, child_node)
+                for child_key, child_node in children
+            )
 
     def show(
         self,
@@ -649,9 +914,9 @@ class Tree(Generic[GenericNode]):
         reverse: bool = False,
         line_type: str = "ascii-ex",
         limit: Optional[int] = None,
-        line_max_length: int = 60,
+        line_max_length: Optional[int] = 60,
         key_delimiter: str = ": ",
-        **kwargs: Any
+        **kwargs: Any,
     ) -> str:
         """Return tree structure in hierarchy style.
 
@@ -665,12 +930,13 @@ class Tree(Generic[GenericNode]):
         :param kwargs: kwargs params passed to node ``line_repr`` method
         :param line_max_length
         """
-        output = ""
+        lines: List[str] = []
+        build_prefix = _prefix_builder(line_type)
 
         for is_last_list, key, node in self._iter_nodes_with_location(
             nid, filter_, reverse
         ):
-            prefix = self._line_prefix_repr(line_type, is_last_list)
+            prefix = build_prefix(is_last_list)
             # do not display nb in list in case of non-keyed children (int key)
             if isinstance(key, str) and display_key:
                 prefix += key
@@ -687,34 +953,37 @@ class Tree(Generic[GenericNode]):
                 line_max_length=line_max_length,
             )
 
-            output += "%s\n" % line
+            lines.append(line)
             if limit is not None:
                 limit -= 1
                 if limit == 0:
-                    output += "...\n(truncated, total number of nodes: %d)\n" % (
-                        len(self._nodes_map.keys())
-                    )
-                    return output
-        return output
+                    lines.append("...")
+                    lines.append(f"(truncated, total number of nodes: {len(self)})")
+                    break
+        if not lines:
+            return ""
+        return "\n".join(lines) + "\n"
 
     def _iter_nodes_with_location(
         self,
         nid: Optional[NodeId],
         filter_: Optional[Callable[[GenericNode], bool]],
         reverse: bool,
-        is_last_list: Optional[List[bool]] = None,
-    ) -> Iterable[Tuple[Tuple[bool, ...], Optional[Key], GenericNode]]:
+    ) -> Iterator[Tuple[Tuple[bool, ...], Optional[Key], GenericNode]]:
         """Yield nodes with information on how they are placed.
+
+        Iterative depth-first traversal driven by an explicit stack, to avoid per-node generator
+        chaining and recursion limits on deep trees. Dispatches once to a specialized path
+        depending on whether a filter applies, so the common unfiltered case doesn't pay the
+        per-child predicate test.
+
         :param nid: starting node identifier
         :param filter_: filter function applied on nodes
         :param reverse: reverse parameter applied at sorting
-        :param is_last_list: list of booleans, each indicating if node is the last yielded one at this depth
-        :return: tuple of booleans, node
+        :return: tuple of booleans (each indicating if an ancestor is the last of its siblings), key, node
         """
         if self.is_empty():
-            return None
-
-        is_last_list = is_last_list or []
+            return iter(())
 
         nid_: NodeId
         if nid is None:
@@ -724,25 +993,61 @@ class Tree(Generic[GenericNode]):
             nid_ = nid
 
         key, node = self.get(nid_)
-        if filter_ is None or filter_(node):
-            yield tuple(is_last_list), key, node
+        if filter_ is None:
+            return self._iter_nodes_with_location_nofilter(key, node, reverse)
+        if not filter_(node):
+            return iter(())
+        return self._iter_nodes_with_location_filtered(key, node, filter_, reverse)
+
+    def _iter_nodes_with_location_nofilter(
+        self, key: Optional[Key], node: GenericNode, reverse: bool
+    ) -> Iterator[Tuple[Tuple[bool, ...], Optional[Key], GenericNode]]:
+        stack: List[Tuple[Tuple[bool, ...], Optional[Key], GenericNode]] = [
+            ((), key, node)
+        ]
+        while stack:
+            is_last_list, key, node = stack.pop()
+            yield is_last_list, key, node
+            # sorted children can be reused across traversals while tree is unchanged
+            cache_key = (node.identifier, reverse)
+            children = self._sorted_children_cache.get(cache_key)
+            if children is None:
+                # children are stored in key order, only a reversal may be needed
+                children = self._children_items(node.identifier)
+                if reverse:
+                    children.reverse()
+                self._sorted_children_cache[cache_key] = children
+            idxlast = len(children) - 1
+            # push in reverse order so that children are popped in display order
+            for idx in range(idxlast, -1, -1):
+                child_key, child_node = children[idx]
+                stack.append((is_last_list + (idx == idxlast,), child_key, child_node))
+
+    def _iter_nodes_with_location_filtered(
+        self,
+        key: Optional[Key],
+        node: GenericNode,
+        filter_: Callable[[GenericNode], bool],
+        reverse: bool,
+    ) -> Iterator[Tuple[Tuple[bool, ...], Optional[Key], GenericNode]]:
+        stack: List[Tuple[Tuple[bool, ...], Optional[Key], GenericNode]] = [
+            ((), key, node)
+        ]
+        while stack:
+            is_last_list, key, node = stack.pop()
+            yield is_last_list, key, node
             children = [
                 (child_key, child_node)
-                for child_key, child_node in self.children(nid_)
-                if filter_ is None or filter_(child_node)
+                for child_key, child_node in self._children_items(node.identifier)
+                if filter_(child_node)
             ]
-            idxlast: int = len(children) - 1
-            children.sort(key=itemgetter(0), reverse=reverse)
-            for idx, (child_k, child) in enumerate(children):
-                is_last_list.append(idx == idxlast)
-                for item in self._iter_nodes_with_location(
-                    nid=child.identifier,
-                    filter_=filter_,
-                    reverse=reverse,
-                    is_last_list=is_last_list,
-                ):
-                    yield item
-                is_last_list.pop()
+            if reverse:
+                children.reverse()
+            idxlast = len(children) - 1
+            # push in reverse order so that children are popped in display order
+            for idx in range(idxlast, -1, -1):
+                child_key, child_node = children[idx]
+                stack.append((is_last_list + (idx == idxlast,), child_key, child_node))
 
     @staticmethod
     def _line_repr(
@@ -751,32 +1056,31 @@ class Tree(Generic[GenericNode]):
         key_delimiter: str,
         node_start: str,
         node_end: str,
-        line_max_length: int,
+        line_max_length: Optional[int],
     ) -> str:
-        line: str = prefix
+        # accumulate segments and concatenate in a single join
+        parts = [prefix]
         if node_start and is_key_displayed:
-            line += key_delimiter
-        line += node_start
+            parts.append(key_delimiter)
+        parts.append(node_start)
+        if line_max_length is None:
+            # unlimited line length, skip padding and truncation entirely
+            if node_end:
+                parts.append(" ")
+                parts.append(node_end)
+            return "".join(parts)
         if node_end:
-            padding = max(line_max_length - len(line) - len(node_end), 0)
-            line += padding * " " + node_end
+            head_length = sum(map(len, parts))
+            parts.append(max(line_max_length - head_length - len(node_end), 0) * " ")
+            parts.append(node_end)
+        line = "".join(parts)
         if len(line) > line_max_length:
-            line = line[: line_max_length - 3] + "..."
+            return line[: line_max_length - 3] + "..."
         return line
 
     @staticmethod
     def _line_prefix_repr(line_type: str, is_last_list: Tuple[bool, ...]) -> str:
-        if not is_last_list:
-            return ""
-        dt_vertical_line, dt_line_box, dt_line_corner = STYLES[line_type]
-        leading: str = "".join(
-            [
-                dt_vertical_line + " " * 3 if not is_last else " " * 4
-                for is_last in cast(Iterable[bool], is_last_list[0:-1])
-            ]
-        )
-        lasting: str = dt_line_corner if is_last_list[-1] else dt_line_box
-        return leading + lasting
+        return _prefix_builder(line_type)(is_last_list)
 
     def merge(
         self: GenTree, new_tree: GenTree, nid: Optional[NodeId] = None
@@ -812,23 +1116,61 @@ class Tree(Generic[GenericNode]):
         """
         if not isinstance(new_tree, self.__class__):
             raise ValueError(
-                'Wrong type of "new_tree", expected <%s>, got <%s>'
-                % (self.__class__.__name__, new_tree.__class__.__name__)
+                f'Wrong type of "new_tree", expected <{self.__class__.__name__}>,'
+                f" got <{new_tree.__class__.__name__}>"
             )
 
         if self.is_empty():
-            return self.insert(new_tree, parent_id=None)
+            if new_tree.root is None:
+                # same contract as the insertion path
+                raise ValueError("Empty inserted tree")
+            # empty target: duplicate the incoming topology wholesale, nodes stay shared
+            return self._bulk_copy_from(new_tree)
 
         if nid is None:
             nid = self.root
         else:
             self._ensure_present(nid)
+        return self._merge_into(new_tree, nid)
+
+    def _merge_into(self: GenTree, new_tree: GenTree, nid: Optional[NodeId]) -> GenTree:
+        """Merge body once type, emptiness and nid were validated.
 
+        Bulk callers merging repeatedly below an already validated node can call it directly.
+        """
         if new_tree.root is None:
             # not possible, only for typing
             raise ValueError("Inserted tree is empty")
-        for ckey, cnode in new_tree.children(new_tree.root):
-            self.insert(new_tree.subtree(cnode.identifier)[1], nid, key=ckey)
+        if (
+            not new_tree._nodes_children_map[new_tree.root]
+            and not new_tree._nodes_children_list[new_tree.root]
+        ):
+            # nothing to splice below target node
+            return self
+        # splice root children in a single traversal, without materializing intermediate subtrees
+        common = self._nodes_map.keys() & new_tree._nodes_map.keys()
+        common.discard(new_tree.root)
+        if common:
+            raise DuplicatedNodeError(f"Can't create node with id '{common.pop()}'")
+        new_root = new_tree.root
+        # only root-children keys can collide (deeper nodes attach under freshly inserted
+        # parents), check them upfront so that a failed merge leaves the tree untouched
+        if nid is not None and self._nodes_map[nid].keyed:
+            common_keys = (
+                self._nodes_children_map[nid].keys()
+                & new_tree._nodes_children_map[new_root].keys()
+            )
+            if common_keys:
+                raise KeyError(
+                    f"Already present node for key {common_keys.pop()} under {nid} node."
+                )
+        for pid, new_key, new_node in new_tree._expand_tree_with_parent(new_root):
+            if pid is None:
+                # the inserted tree root itself is not pasted
+                continue
+            if pid == new_root:
+                pid = nid
+            self._insert_node_below(new_node, parent_id=pid, key=new_key)
         return self
 
     def __str__(self) -> str:
@@ -1,7 +1,9 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from typing import Dict, Tuple
+import sys
+
+from typing import Dict, NamedTuple, Tuple
 
 STYLES: Dict[str, Tuple[str, str, str]] = {
     "ascii": ("|", "|-- ", "+-- "),
@@ -11,3 +13,24 @@ STYLES: Dict[str, Tuple[str, str, str]] = {
     "ascii-emv": ("\u2551", "\u255f\u2500\u2500 ", "\u2559\u2500\u2500 "),
     "ascii-emh": ("\u2502", "\u255e\u2550\u2550 ", "\u2558\u2550\u2550 "),
 }
+
+
+class PrefixSegments(NamedTuple):
+    """Canonical prefix strings of a line style, precomputed once for line rendering."""
+
+    vertical: str
+    blank: str
+    box: str
+    corner: str
+
+
+# segments are interned: every prefix join works on the same few shared string objects
+PREFIX_SEGMENTS: Dict[str, PrefixSegments] = {
+    style: PrefixSegments(
+        vertical=sys.intern(vertical_line + " " * 3),
+        blank=sys.intern(" " * 4),
+        box=sys.intern(line_box),
+        corner=sys.intern(line_corner),
+    )
+    for style, (vertical_line, line_box, line_corner) in STYLES.items()
+}
@@ -7,9 +7,7 @@ from lighttree.implementations.json_tree import (
 
 def test_json_tree():
     j = JsonTree({"a": [{}, {"b": 12}, [1, 2, 3]]})
-    assert (
-        j.__str__()
-        == """{}
+    assert j.__str__() == """{}
 └── a: []
     ├── {}
     ├── {}
@@ -19,14 +17,11 @@ def test_json_tree():
         ├── 2
         └── 3
 """
-    )
 
 
 def test_as_interactive_json_tree():
     j = as_interactive_json({"a": [{}, {"b": 12}, [1, 2, 3]]})
-    assert (
-        j.__str__()
-        == """<InteractiveJson>
+    assert j.__str__() == """<InteractiveJson>
 {}
 └── a: []
     ├── {}
@@ -37,7 +32,6 @@ def test_as_interactive_json_tree():
         ├── 2
         └── 3
 """
-    )
     assert "a" in dir(j)
     a = j.a
     assert isinstance(a, InteractiveJson)
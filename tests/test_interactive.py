@@ -184,9 +184,7 @@ def test_tree_based_obj():
     assert a._tree.get("aa") == obj._tree.get("aa")
 
     # test representations
-    assert (
-        obj._show()
-        == """<SomeCoolTree>
+    assert obj._show() == """<SomeCoolTree>
 {}
 ├── a: {}
 │   ├── a: []
@@ -197,23 +195,16 @@ def test_tree_based_obj():
     ├── C0
     └── C1
 """
-    )
-    assert (
-        a._show()
-        == """<SomeCoolTree subpart: a>
+    assert a._show() == """<SomeCoolTree subpart: a>
 {}
 ├── a: []
 │   ├── AA0
 │   └── AA1
 └── b: {}
 """
-    )
-    assert (
-        a.a.i0._show()
-        == """<SomeCoolTree subpart: a.a.0>
+    assert a.a.i0._show() == """<SomeCoolTree subpart: a.a.0>
 AA0
 """
-    )
 
 
 def test_tree_set_get_attrs():
@@ -1,5 +1,11 @@
+import os
+
 from lighttree import Tree, Node
 
+# full invariant walks between mutations are expensive; they are opt-in via
+# LIGHTTREE_SANITY=1, while each test keeps an unconditional final check
+SANITY = os.environ.get("LIGHTTREE_SANITY") == "1"
+
 
 def tree_sanity_check(tree):
     assert isinstance(tree, Tree)
@@ -21,14 +27,15 @@ def tree_sanity_check(tree):
         else:
             assert pid is not None
             if tree._nodes_map[pid].keyed:
-                assert nid in tree._nodes_children_map[pid]
+                key = tree._nodes_child_key[nid]
                 # ensure key is string
-                assert isinstance(tree._nodes_children_map[pid][nid], str)
+                assert isinstance(key, str)
+                assert tree._nodes_children_map[pid][key] == nid
             else:
                 assert nid in tree._nodes_children_list[pid]
         # ensure all children have this node registered as parent
         if node.keyed:
-            for cid in tree._nodes_children_map[nid].keys():
+            for cid in tree._nodes_children_map[nid].values():
                 assert tree._nodes_parent[cid] == nid
         else:
             for cid in tree._nodes_children_list[nid]:
@@ -51,17 +58,22 @@ def get_sample_tree():
         └── c1
     """
     t = Tree()
-    t.insert_node(Node(identifier="root"))
-    t.insert_node(Node(identifier="a"), parent_id="root", key="a")
-    t.insert_node(Node(identifier="aa", keyed=False), parent_id="a", key="a")
-    t.insert_node(Node(identifier="aa0", repr_="AA0"), parent_id="aa")
-    t.insert_node(Node(identifier="aa1", repr_="AA1"), parent_id="aa")
-    t.insert_node(Node(identifier="ab"), parent_id="a", key="b")
-    t.insert_node(Node(identifier="c", keyed=False), parent_id="root", key="c")
-    t.insert_node(Node(identifier="c0", repr_="C0"), parent_id="c")
-    t.insert_node(Node(identifier="c1", repr_="C1"), parent_id="c")
+    t.insert_nodes(
+        [
+            (Node(identifier="root"), None, None),
+            (Node(identifier="a"), "root", "a"),
+            (Node(identifier="aa", keyed=False), "a", "a"),
+            (Node(identifier="aa0", repr_="AA0"), "aa", None),
+            (Node(identifier="aa1", repr_="AA1"), "aa", None),
+            (Node(identifier="ab"), "a", "b"),
+            (Node(identifier="c", keyed=False), "root", "c"),
+            (Node(identifier="c0", repr_="C0"), "c", None),
+            (Node(identifier="c1", repr_="C1"), "c", None),
+        ]
+    )
 
-    tree_sanity_check(t)
+    if SANITY:
+        tree_sanity_check(t)
     return t
 
 
@@ -73,8 +85,12 @@ def get_sample_tree_2():
     └── b2 {}
     """
     t = Tree()
-    t.insert_node(Node("broot", keyed=False))
-    t.insert_node(Node("b1"), parent_id="broot")
-    t.insert_node(Node("b1a"), parent_id="b1", key="a")
-    t.insert_node(Node("b2"), parent_id="broot")
+    t.insert_nodes(
+        [
+            (Node("broot", keyed=False), None, None),
+            (Node("b1"), "broot", None),
+            (Node("b1a"), "b1", "a"),
+            (Node("b2"), "broot", None),
+        ]
+    )
     return t